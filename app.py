@@ -1,6 +1,9 @@
-from flask import Flask, render_template, request, flash
+from quart import Quart, render_template, request, flash
 from dbase import Dbase
-import boto3
+from aws_auth import get_boto_config
+import aioboto3
+import contextlib
+import functools
 from botocore.exceptions import ClientError
 import os
 from dotenv import load_dotenv
@@ -8,20 +11,48 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-app.secret_key = os.urandom(24)  # Required for flash messages
+TABLE_NAME = os.getenv('DYNAMODB_TABLE_NAME')
+S3_BUCKET = os.getenv('S3_BUCKET')
 
-# Initialize AWS clients
-db = Dbase()
-s3_client = boto3.client('s3')
+app = Quart(__name__)
+# Required for flash messages; set FLASK_SECRET_KEY to share sessions across workers
+app.secret_key = os.getenv('FLASK_SECRET_KEY') or os.urandom(24)
 
-def get_s3_image_url(image_key):
+# AWS clients are created on first use; the async clients are opened in _open_clients
+s3_client = None
+_clients = contextlib.AsyncExitStack()
+
+@functools.cache
+def get_db():
+    """Return the shared Dbase instance"""
+    return Dbase()
+
+@functools.cache
+def get_s3_session():
+    """Return the shared aioboto3 session used for S3"""
+    return aioboto3.Session()
+
+@app.before_serving
+async def _open_clients():
+    """Open the long-lived aioboto3 DynamoDB and S3 clients"""
+    global s3_client
+    await get_db().open_async_client(_clients)
+    s3_client = await _clients.enter_async_context(
+        get_s3_session().client('s3', config=get_boto_config())
+    )
+
+@app.after_serving
+async def _close_clients():
+    """Close the aioboto3 clients"""
+    await _clients.aclose()
+
+async def get_s3_image_url(image_key):
     """Generate a pre-signed URL for the S3 image"""
     try:
-        url = s3_client.generate_presigned_url(
+        url = await s3_client.generate_presigned_url(
             'get_object',
             Params={
-                'Bucket': os.getenv('S3_BUCKET'),
+                'Bucket': S3_BUCKET,
                 'Key': image_key
             },
             ExpiresIn=3600  # URL expires in 1 hour
@@ -32,32 +63,33 @@ def get_s3_image_url(image_key):
         return None
 
 @app.route('/', methods=['GET', 'POST'])
-def index():
+async def index():
     product = None
     image_url = None
     error = None
 
     if request.method == 'POST':
-        product_id = request.form.get('product_id')
+        form = await request.form
+        product_id = form.get('product_id')
         if product_id:
             # Get product from DynamoDB
-            product = db.get_item(os.getenv('DYNAMODB_TABLE_NAME'), product_id)
+            product = await get_db().get_item_async(TABLE_NAME, product_id)
             
             if product:
                 # Convert DynamoDB format to regular dictionary
-                product = {k: v.get(list(v.keys())[0]) for k, v in product.items()}
+                product = Dbase.from_dynamodb_format(product)
                 
                 # Get image URL from S3
                 if 'image' in product and 'category' in product:
                     image_key = f"{product['category']}/{product['image']}"
-                    image_url = get_s3_image_url(image_key)
+                    image_url = await get_s3_image_url(image_key)
             else:
                 error = "Product not found"
 
-    return render_template('index.html', 
-                         product=product, 
-                         image_url=image_url, 
-                         error=error)
+    return await render_template('index.html', 
+                               product=product, 
+                               image_url=image_url, 
+                               error=error)
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -1,6 +1,26 @@
+import os
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, ProfileNotFound
 
+def get_boto_config():
+    """
+    Build the botocore client configuration shared by all AWS clients
+
+    Keeps TCP connections alive and sizes the connection pool so sockets are
+    reused across calls instead of paying a TLS handshake per request.
+
+    :return: botocore Config instance
+    """
+    return Config(
+        tcp_keepalive=True,
+        max_pool_connections=int(os.getenv('BOTO_POOL', '64')),
+        retries={'mode': 'adaptive', 'max_attempts': 5},
+        connect_timeout=3,
+        read_timeout=5,
+        user_agent_extra='search/keepalive'
+    )
+
 def aws_login(profile_name='default', region_name='us-east-1'):
     """
     Authenticate with AWS using either profile credentials or default credentials
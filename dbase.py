@@ -1,10 +1,75 @@
+import asyncio
 import boto3
+import itertools
 import json
+import time
+from datetime import date, datetime
 from decimal import Decimal
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 from botocore.exceptions import ClientError
-from aws_auth import aws_login
+from aws_auth import aws_login, get_boto_config
 from debug import debug
 
+# Maximum number of items DynamoDB accepts in a single BatchWriteItem call
+BATCH_WRITE_SIZE = 25
+# Maximum number of keys DynamoDB accepts in a single BatchGetItem call
+BATCH_GET_SIZE = 100
+# Maximum number of attempts for items or keys DynamoDB returns as unprocessed
+BATCH_MAX_ATTEMPTS = 5
+
+_TD = TypeDeserializer()
+_TS = TypeSerializer()
+
+def _chunked(iterable, size):
+    """
+    Yield successive lists of at most size elements from iterable
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _projection(attributes):
+    """
+    Build ProjectionExpression arguments for the given attribute names
+    
+    Every name goes through ExpressionAttributeNames so reserved words
+    such as 'name' are safe to request.
+    """
+    if not attributes:
+        return {}
+    return {
+        'ProjectionExpression': ','.join(f'#a{i}' for i in range(len(attributes))),
+        'ExpressionAttributeNames': {f'#a{i}': a for i, a in enumerate(attributes)}
+    }
+
+def _to_serializable(value):
+    """
+    Replace floats with Decimal so TypeSerializer accepts them
+    
+    Dates and datetimes (YAML timestamps) are stored as ISO 8601 strings;
+    everything else is left for TypeSerializer.
+    """
+    if isinstance(value, float):
+        return Decimal(str(value))
+    elif isinstance(value, (date, datetime)):
+        return value.isoformat()
+    elif isinstance(value, dict):
+        return {k: _to_serializable(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_to_serializable(v) for v in value]
+    elif isinstance(value, (set, frozenset)):
+        return {_to_serializable(v) for v in value}
+    return value
+
+def _to_dynamodb_format(item):
+    """
+    Convert a dictionary to DynamoDB attribute value format
+    """
+    return {k: _TS.serialize(_to_serializable(v)) for k, v in item.items()}
+
 class Dbase:
     def __init__(self, profile_name=None, region_name='us-east-1'):
         """
@@ -16,6 +81,8 @@ class Dbase:
         self.profile_name = profile_name
         self.region_name = region_name
         self.client = None
+        self.async_client = None
+        self._botocfg = get_boto_config()
         self._connect()
 
     @debug
@@ -28,13 +95,35 @@ class Dbase:
             session = boto3.Session(profile_name=self.profile_name, region_name=self.region_name)
             
             # Create DynamoDB client
-            self.client = session.client('dynamodb')
+            self.client = session.client('dynamodb', config=self._botocfg)
             return True
         except Exception as e:
             print(f"Error creating DynamoDB client: {e}")
             self.client = None
             return False
 
+    @debug
+    async def open_async_client(self, stack):
+        """
+        Open a long-lived aioboto3 DynamoDB client for the async methods
+        
+        :param stack: contextlib.AsyncExitStack that owns the client lifetime
+        :return: aioboto3 DynamoDB client, None if it could not be created
+        """
+        try:
+            # Imported here so the synchronous code paths do not need aioboto3
+            import aioboto3
+
+            session = aioboto3.Session(profile_name=self.profile_name, region_name=self.region_name)
+            self.async_client = await stack.enter_async_context(
+                session.client('dynamodb', config=self._botocfg)
+            )
+            return self.async_client
+        except Exception as e:
+            print(f"Error creating async DynamoDB client: {e}")
+            self.async_client = None
+            return None
+
     @debug
     def create_table(self, table_name):
         """
@@ -99,25 +188,8 @@ class Dbase:
                 return False
 
         try:
-            # Convert item to DynamoDB format
-            def convert_to_dynamodb_format(value):
-                if isinstance(value, str):
-                    return {'S': value}
-                elif isinstance(value, (int, float)):
-                    return {'N': str(value)}
-                elif isinstance(value, bool):
-                    return {'BOOL': value}
-                elif isinstance(value, list):
-                    return {'L': [convert_to_dynamodb_format(v) for v in value]}
-                elif isinstance(value, dict):
-                    return {'M': {k: convert_to_dynamodb_format(v) for k, v in value.items()}}
-                elif value is None:
-                    return {'NULL': True}
-                else:
-                    return {'S': str(value)}
-
             # Convert the entire item to DynamoDB format
-            dynamodb_item = {k: convert_to_dynamodb_format(v) for k, v in item.items()}
+            dynamodb_item = _to_dynamodb_format(item)
             
             # Add item to table
             self.client.put_item(
@@ -136,12 +208,93 @@ class Dbase:
             return False
 
     @debug
-    def get_item(self, table_name, item_id):
+    def batch_add_items(self, table_name, items):
+        """
+        Add items to the specified DynamoDB table using BatchWriteItem
+        
+        Items are written in chunks of BATCH_WRITE_SIZE; unprocessed items are
+        retried with exponential backoff. Items without a non-empty string id
+        fail on their own, and a chunk DynamoDB rejects as invalid is retried
+        item by item so only the offending items fail.
+        
+        :param table_name: Name of the DynamoDB table
+        :param items: List of dictionaries containing the item data
+        :return: List of the items that could not be written
+        """
+        if not self.client:
+            if not self._connect():
+                return list(items)
+
+        failed = []
+        for chunk in _chunked(items, BATCH_WRITE_SIZE):
+            # Items that cannot be converted (e.g. NaN) fail on their own
+            converted = []
+            for item in chunk:
+                try:
+                    if not isinstance(item.get('id'), str) or not item['id']:
+                        raise ValueError("id must be a non-empty string")
+                    converted.append((item, _to_dynamodb_format(item)))
+                except Exception as e:
+                    print(f"Error converting item {item.get('id')}: {e}")
+                    failed.append(item)
+
+            # BatchWriteItem rejects duplicate keys in one request; keep the
+            # last occurrence so the last write wins, as with put_item
+            latest = {}
+            for item, dynamodb_item in converted:
+                latest[item['id']] = dynamodb_item
+            requests = [{'PutRequest': {'Item': it}} for it in latest.values()]
+            if not requests:
+                continue
+
+            try:
+                for attempt in range(BATCH_MAX_ATTEMPTS):
+                    response = self.client.batch_write_item(
+                        RequestItems={table_name: requests}
+                    )
+                    requests = response.get('UnprocessedItems', {}).get(table_name, [])
+                    if not requests or attempt == BATCH_MAX_ATTEMPTS - 1:
+                        break
+                    time.sleep(min(0.05 * 2 ** attempt, 2))
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ValidationException':
+                    # One invalid item rejects the whole batch; write them one
+                    # by one so only the invalid items fail
+                    print(f"Batch rejected, adding items individually: {e}")
+                    remaining = []
+                    for request in requests:
+                        try:
+                            self.client.put_item(
+                                TableName=table_name,
+                                Item=request['PutRequest']['Item']
+                            )
+                        except Exception as put_error:
+                            print(f"Error adding item to table: {put_error}")
+                            remaining.append(request)
+                    requests = remaining
+                else:
+                    print(f"Error adding items to table: {e}")
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+
+            # Anything still pending after the retries (or an error) has failed
+            unprocessed = [r['PutRequest']['Item'] for r in requests]
+            failed.extend(
+                item for item, _ in converted
+                if latest[item['id']] in unprocessed
+            )
+
+        print(f"Successfully added {len(items) - len(failed)} items to table {table_name}")
+        return failed
+
+    @debug
+    def get_item(self, table_name, item_id, attributes=None):
         """
         Get an item from the specified DynamoDB table
         
         :param table_name: Name of the DynamoDB table
         :param item_id: ID of the item to retrieve
+        :param attributes: Names of the attributes to return (default: None, all)
         :return: Item data if found, None otherwise
         """
         if not self.client:
@@ -154,7 +307,8 @@ class Dbase:
                 TableName=table_name,
                 Key={
                     'id': {'S': item_id}
-                }
+                },
+                **_projection(attributes)
             )
             
             if 'Item' in response:
@@ -170,6 +324,146 @@ class Dbase:
             print(f"Unexpected error: {e}")
             return None
 
+    @debug
+    async def get_item_async(self, table_name, item_id, attributes=None):
+        """
+        Get an item from the specified DynamoDB table using the async client
+        
+        :param table_name: Name of the DynamoDB table
+        :param item_id: ID of the item to retrieve
+        :param attributes: Names of the attributes to return (default: None, all)
+        :return: Item data if found, None otherwise
+        """
+        if not self.async_client:
+            print("Async DynamoDB client is not open")
+            return None
+
+        try:
+            # Get item from table
+            response = await self.async_client.get_item(
+                TableName=table_name,
+                Key={
+                    'id': {'S': item_id}
+                },
+                **_projection(attributes)
+            )
+            
+            if 'Item' in response:
+                return response['Item']
+            else:
+                print(f"Item {item_id} not found in table {table_name}")
+                return None
+                
+        except ClientError as e:
+            print(f"Error getting item from table: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return None
+
+    @debug
+    def batch_get_items(self, table_name, ids, attributes=None):
+        """
+        Get several items from the specified DynamoDB table using BatchGetItem
+        
+        Keys are requested in chunks of BATCH_GET_SIZE; unprocessed keys are
+        retried with exponential backoff. Keys still unprocessed after the
+        retries, or lost to an error, are returned separately so callers can
+        tell them apart from items that do not exist.
+        
+        :param table_name: Name of the DynamoDB table
+        :param ids: IDs of the items to retrieve
+        :param attributes: Names of the attributes to return (default: None, all);
+                           'id' is always included
+        :return: Tuple of (dictionary mapping each found ID to its item data,
+                 list of IDs that could not be processed)
+        """
+        # BatchGetItem rejects duplicate keys within a request
+        ids = list(dict.fromkeys(ids))
+        if not self.client:
+            if not self._connect():
+                return {}, ids
+
+        # Results are keyed by id, so it must be part of any projection
+        if attributes and 'id' not in attributes:
+            attributes = ['id', *attributes]
+
+        out = {}
+        unprocessed = []
+        for chunk in _chunked(ids, BATCH_GET_SIZE):
+            keys = [{'id': {'S': i}} for i in chunk]
+            try:
+                for attempt in range(BATCH_MAX_ATTEMPTS):
+                    response = self.client.batch_get_item(
+                        RequestItems={table_name: {'Keys': keys, **_projection(attributes)}}
+                    )
+                    for item in response.get('Responses', {}).get(table_name, []):
+                        out[item['id']['S']] = item
+                    keys = response.get('UnprocessedKeys', {}).get(table_name, {}).get('Keys', [])
+                    if not keys or attempt == BATCH_MAX_ATTEMPTS - 1:
+                        break
+                    time.sleep(min(0.05 * 2 ** attempt, 2))
+            except ClientError as e:
+                print(f"Error getting items from table: {e}")
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+
+            # Anything still pending after the retries (or an error) was not processed
+            unprocessed.extend(key['id']['S'] for key in keys)
+
+        if unprocessed:
+            print(f"Could not process {len(unprocessed)} keys in table {table_name}")
+        return out, unprocessed
+
+    @debug
+    async def batch_get_items_async(self, table_name, ids, attributes=None):
+        """
+        Get several items from the specified DynamoDB table using the async client
+        
+        :param table_name: Name of the DynamoDB table
+        :param ids: IDs of the items to retrieve
+        :param attributes: Names of the attributes to return (default: None, all);
+                           'id' is always included
+        :return: Tuple of (dictionary mapping each found ID to its item data,
+                 list of IDs that could not be processed)
+        """
+        # BatchGetItem rejects duplicate keys within a request
+        ids = list(dict.fromkeys(ids))
+        if not self.async_client:
+            print("Async DynamoDB client is not open")
+            return {}, ids
+
+        # Results are keyed by id, so it must be part of any projection
+        if attributes and 'id' not in attributes:
+            attributes = ['id', *attributes]
+
+        out = {}
+        unprocessed = []
+        for chunk in _chunked(ids, BATCH_GET_SIZE):
+            keys = [{'id': {'S': i}} for i in chunk]
+            try:
+                for attempt in range(BATCH_MAX_ATTEMPTS):
+                    response = await self.async_client.batch_get_item(
+                        RequestItems={table_name: {'Keys': keys, **_projection(attributes)}}
+                    )
+                    for item in response.get('Responses', {}).get(table_name, []):
+                        out[item['id']['S']] = item
+                    keys = response.get('UnprocessedKeys', {}).get(table_name, {}).get('Keys', [])
+                    if not keys or attempt == BATCH_MAX_ATTEMPTS - 1:
+                        break
+                    await asyncio.sleep(min(0.05 * 2 ** attempt, 2))
+            except ClientError as e:
+                print(f"Error getting items from table: {e}")
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+
+            # Anything still pending after the retries (or an error) was not processed
+            unprocessed.extend(key['id']['S'] for key in keys)
+
+        if unprocessed:
+            print(f"Could not process {len(unprocessed)} keys in table {table_name}")
+        return out, unprocessed
+
     @debug
     def delete_table(self, table_name):
         """
@@ -202,6 +496,18 @@ class Dbase:
             print(f"Unexpected error: {e}")
             return False
 
+    @staticmethod
+    def from_dynamodb_format(item):
+        """
+        Convert an item in DynamoDB attribute value format to a regular dictionary
+        
+        Numbers come back as Decimal and sets as Python sets.
+        
+        :param item: Item as returned by get_item or batch_get_items
+        :return: Dictionary of plain Python values
+        """
+        return {k: _TD.deserialize(v) for k, v in item.items()}
+
     @staticmethod
     def get_table_schema():
         """
@@ -1,19 +1,46 @@
+import atexit
 import functools
+import inspect
 import logging
+import os
+import queue
 import time
 import traceback
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
-# Configure logging
+# Configure logging. Callers only enqueue records; a background listener
+# formats them and writes to the log file and console. Set LOG_LEVEL=DEBUG
+# to enable the debug decorator output.
+_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler('debug.log')
+_file_handler.setFormatter(_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_formatter)
+
+_log_queue = queue.SimpleQueue()
+_listener = QueueListener(_log_queue, _file_handler, _stream_handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
+# Fall back to INFO when LOG_LEVEL is not a known level name
+_log_level_name = (os.getenv('LOG_LEVEL') or 'INFO').upper()
+_log_level = logging.getLevelName(_log_level_name)
+_log_level_valid = isinstance(_log_level, int)
+if not _log_level_valid:
+    _log_level = logging.INFO
+
+# The queue handler only merges the message arguments; the listener's
+# handlers apply the full format
 logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('debug.log'),
-        logging.StreamHandler()
-    ]
+    level=_log_level,
+    format='%(message)s',
+    handlers=[QueueHandler(_log_queue)]
 )
 
+if not _log_level_valid:
+    logging.getLogger(__name__).warning(f"Invalid LOG_LEVEL {_log_level_name!r}, using INFO")
+
 # Disable boto3 and botocore debug messages
 logging.getLogger('boto3').setLevel(logging.WARNING)
 logging.getLogger('botocore').setLevel(logging.WARNING)
@@ -23,37 +50,75 @@ def debug(func):
     """
     Debug decorator that logs function entry, exit, execution time, and any errors
     
+    Works for both regular functions and coroutine functions. Entry, exit and
+    timing are only recorded while the module logger has DEBUG enabled;
+    otherwise the call goes straight through and only errors are logged.
+    
     :param func: Function to be decorated
     :return: Decorated function
     """
+    # Get logger for the function's module
+    logger = logging.getLogger(func.__module__)
+
+    def log_error(e, execution_time=None):
+        if execution_time is None:
+            logger.error("Error in %s", func.__name__)
+        else:
+            logger.error("Error in %s - Execution time: %.2fs", func.__name__, execution_time)
+        logger.error("Error: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not logger.isEnabledFor(logging.DEBUG):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    log_error(e)
+                    raise
+
+            logger.debug("Entering %s(%r, %r)", func.__name__, args, kwargs)
+            start_time = time.perf_counter()
+            try:
+                # Execute the coroutine
+                result = await func(*args, **kwargs)
+                logger.debug("Exiting %s - Execution time: %.2fs",
+                             func.__name__, time.perf_counter() - start_time)
+                return result
+            except Exception as e:
+                log_error(e, time.perf_counter() - start_time)
+                raise
+
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Get logger for the function's module
-        logger = logging.getLogger(func.__module__)
-        
+        # Skip argument formatting and timing when debug output is discarded
+        if not logger.isEnabledFor(logging.DEBUG):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                log_error(e)
+                raise
+
         # Log function entry
-        func_args = ', '.join([
-            f"{k}={v!r}" for k, v in kwargs.items()
-        ] + [repr(a) for a in args])
-        logger.debug(f"Entering {func.__name__}({func_args})")
+        logger.debug("Entering %s(%r, %r)", func.__name__, args, kwargs)
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             # Execute the function
             result = func(*args, **kwargs)
             
             # Log function exit and execution time
-            execution_time = time.time() - start_time
-            logger.debug(f"Exiting {func.__name__} - Execution time: {execution_time:.2f}s")
+            logger.debug("Exiting %s - Execution time: %.2fs",
+                         func.__name__, time.perf_counter() - start_time)
             
             return result
             
         except Exception as e:
             # Log any errors
-            execution_time = time.time() - start_time
-            logger.error(f"Error in {func.__name__} - Execution time: {execution_time:.2f}s")
-            logger.error(f"Error: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            log_error(e, time.perf_counter() - start_time)
             raise
             
-    return wrapper 
\ No newline at end of file
+    return wrapper
\ No newline at end of file
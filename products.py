@@ -1,15 +1,19 @@
-from flask import Flask, request, jsonify, render_template
-from aws_auth import aws_login
-from dbase import Dbase
+from quart import Quart, request, render_template
+from aws_auth import aws_login, get_boto_config
+from dbase import Dbase, BATCH_GET_SIZE
+import aioboto3
+import asyncio
+import contextlib
+import functools
 import json
+import orjson
 import os
+from decimal import Decimal
 from dotenv import load_dotenv
-import boto3
 from botocore.exceptions import ClientError
+from cachetools import TTLCache
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -27,21 +31,106 @@ if not os.getenv('DYNAMODB_TABLE_NAME'):
     logger.warning(f"DYNAMODB_TABLE_NAME not set, using default: {DEFAULT_TABLE_NAME}")
     os.environ['DYNAMODB_TABLE_NAME'] = DEFAULT_TABLE_NAME
 
-app = Flask(__name__)
+# Resolved configuration used on the request path
+TABLE_NAME = os.getenv('DYNAMODB_TABLE_NAME', DEFAULT_TABLE_NAME)
+S3_BUCKET = os.getenv('S3_BUCKET', DEFAULT_S3_BUCKET)
+# Product attributes returned by the API: the table schema plus the
+# timestamp the uploader adds to every item
+PRODUCT_ATTRIBUTES = [*Dbase.get_table_schema(), 'created_at']
 
-# Initialize AWS clients
-db = Dbase()
-s3_client = boto3.client('s3')
+app = Quart(__name__)
 
-def get_s3_image_url(image_key):
+# AWS clients are created on first use; the async clients are opened in _open_clients
+s3_client = None
+_clients = contextlib.AsyncExitStack()
+
+@functools.lru_cache(maxsize=32)
+def _get_db(profile, region):
+    """Return a Dbase instance shared by create-table requests for the same profile and region"""
+    return Dbase(profile_name=profile, region_name=region)
+
+@functools.cache
+def get_db():
+    """Return the shared Dbase instance used for serving product lookups"""
+    return Dbase()
+
+@functools.cache
+def get_s3_session():
+    """Return the shared aioboto3 session used for S3"""
+    return aioboto3.Session()
+
+@app.before_serving
+async def _open_clients():
+    """Open the long-lived aioboto3 DynamoDB and S3 clients"""
+    global s3_client
+    await get_db().open_async_client(_clients)
+    s3_client = await _clients.enter_async_context(
+        get_s3_session().client('s3', config=get_boto_config())
+    )
+    await _warm_clients()
+
+# Upper bound on how long warm-up may delay serving, in seconds
+WARM_UP_TIMEOUT = 2
+
+async def _warm_clients():
+    """Issue cheap DynamoDB and S3 calls so the first request finds open sockets"""
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                get_db().async_client.describe_table(TableName=TABLE_NAME),
+                s3_client.head_bucket(Bucket=S3_BUCKET)
+            ),
+            timeout=WARM_UP_TIMEOUT
+        )
+        logger.info("Warmed DynamoDB and S3 connections")
+    except asyncio.TimeoutError:
+        logger.warning(f"Connection warm-up timed out after {WARM_UP_TIMEOUT}s")
+    except Exception as e:
+        logger.warning(f"Connection warm-up failed: {str(e)}")
+
+@app.after_serving
+async def _close_clients():
+    """Close the aioboto3 clients"""
+    await _clients.aclose()
+
+# Presigned URLs by image key. The TTL is shorter than the URL expiry so a
+# cached URL always has at least 30 minutes of validity left. Views run on a
+# single event loop, so the cache needs no lock.
+_url_cache = TTLCache(maxsize=10000, ttl=1800)
+
+# Flattened product dictionaries by (table_name, product_id)
+_product_cache = TTLCache(maxsize=50_000, ttl=60)
+_product_cache_stats = {'hits': 0, 'misses': 0}
+
+def _json_default(value):
+    """Serialize the types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _json(payload, status=200):
+    """Build a JSON response using orjson"""
+    return app.response_class(
+        orjson.dumps(payload, default=_json_default),
+        status=status,
+        mimetype='application/json'
+    )
+
+async def get_s3_image_url(image_key):
     """Generate a pre-signed URL for the S3 image"""
+    url = _url_cache.get(image_key)
+    if url is not None:
+        return url
+
     try:
-        bucket_name = os.getenv('S3_BUCKET', DEFAULT_S3_BUCKET)
+        bucket_name = S3_BUCKET
         logger.debug(f"Generating presigned URL for bucket: {bucket_name}, key: {image_key}")
         
         # Check if the object exists
         try:
-            s3_client.head_object(Bucket=bucket_name, Key=image_key)
+            await s3_client.head_object(Bucket=bucket_name, Key=image_key)
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
                 logger.error(f"Image not found in S3: {image_key}")
@@ -50,7 +139,7 @@ def get_s3_image_url(image_key):
                 raise
         
         # Generate presigned URL
-        url = s3_client.generate_presigned_url(
+        url = await s3_client.generate_presigned_url(
             'get_object',
             Params={
                 'Bucket': bucket_name,
@@ -59,18 +148,19 @@ def get_s3_image_url(image_key):
             ExpiresIn=3600  # URL expires in 1 hour
         )
         logger.debug(f"Generated presigned URL: {url}")
+        _url_cache[image_key] = url
         return url
     except Exception as e:
         logger.error(f"Error generating presigned URL: {str(e)}")
         return None
 
 @app.route('/', methods=['GET'])
-def index():
+async def index():
     """Serve the main page"""
-    return render_template('index.html')
+    return await render_template('index.html')
 
 @app.route('/api/aws/login', methods=['POST'])
-def login_aws():
+async def login_aws():
     """
     REST API endpoint to authenticate with AWS
     Expected JSON body:
@@ -80,32 +170,32 @@ def login_aws():
     }
     """
     try:
-        data = request.get_json()
+        data = await request.get_json()
         profile_name = data.get('profile_name')
         region_name = data.get('region_name', 'us-east-1')
         
-        session = aws_login(profile_name, region_name)
+        session = await asyncio.to_thread(aws_login, profile_name, region_name)
         
         if session:
-            return jsonify({
+            return _json({
                 'status': 'success',
                 'message': 'Successfully authenticated with AWS',
                 'region': region_name
-            }), 200
+            }, 200)
         else:
-            return jsonify({
+            return _json({
                 'status': 'error',
                 'message': 'Failed to authenticate with AWS'
-            }), 401
+            }, 401)
             
     except Exception as e:
-        return jsonify({
+        return _json({
             'status': 'error',
             'message': f'Error during AWS authentication: {str(e)}'
-        }), 500
+        }, 500)
 
 @app.route('/api/dynamodb/create-table', methods=['POST'])
-def create_table():
+async def create_table():
     """
     REST API endpoint to create a DynamoDB table
     Expected JSON body:
@@ -116,63 +206,74 @@ def create_table():
     }
     """
     try:
-        data = request.get_json()
+        data = await request.get_json()
         
         # Validate required fields
         if 'table_name' not in data:
-            return jsonify({
+            return _json({
                 'status': 'error',
                 'message': 'Missing required field: table_name'
-            }), 400
+            }, 400)
         
         # Extract parameters
         table_name = data['table_name']
         profile_name = data.get('profile_name')
         region_name = data.get('region_name', 'us-east-1')
         
-        # Create new Dbase instance with specified profile and region
-        db_instance = Dbase(profile_name=profile_name, region_name=region_name)
+        # Reuse the Dbase instance for this profile and region
+        db_instance = _get_db(profile_name, region_name)
         
         # Create the table
-        success = db_instance.create_table(table_name)
+        success = await asyncio.to_thread(db_instance.create_table, table_name)
         
         if success:
-            return jsonify({
+            return _json({
                 'status': 'success',
                 'message': f'Table {table_name} created successfully',
                 'table_name': table_name,
                 'schema': Dbase.get_table_schema(),
                 'region': region_name
-            }), 201
+            }, 201)
         else:
-            return jsonify({
+            return _json({
                 'status': 'error',
                 'message': f'Failed to create table {table_name}'
-            }), 500
+            }, 500)
             
     except Exception as e:
-        return jsonify({
+        return _json({
             'status': 'error',
             'message': f'Error creating DynamoDB table: {str(e)}'
-        }), 500
+        }, 500)
 
 @app.route('/api/products/<product_id>', methods=['GET'])
-def get_product(product_id):
+async def get_product(product_id):
     """
     REST API endpoint to get a product by ID
     URL Parameter: product_id
     Returns: Product details and image URL if found
     """
     try:
-        table_name = os.getenv('DYNAMODB_TABLE_NAME', DEFAULT_TABLE_NAME)
+        table_name = TABLE_NAME
         logger.debug(f"Getting product {product_id} from table {table_name}")
         
+        # Serve hot products from the cache
+        key = (table_name, product_id)
+        cached = _product_cache.get(key)
+        if cached is not None:
+            _product_cache_stats['hits'] += 1
+            return _json({
+                'status': 'success',
+                'data': cached
+            }, 200)
+        _product_cache_stats['misses'] += 1
+        
         # Get product from DynamoDB
-        product = db.get_item(table_name, product_id)
+        product = await get_db().get_item_async(table_name, product_id, PRODUCT_ATTRIBUTES)
         
         if product:
             # Convert DynamoDB format to regular dictionary
-            product_dict = {k: v.get(list(v.keys())[0]) for k, v in product.items()}
+            product_dict = Dbase.from_dynamodb_format(product)
             logger.debug(f"Retrieved product: {product_dict}")
             
             # Get image URL from S3 if image exists
@@ -180,42 +281,105 @@ def get_product(product_id):
             if 'image' in product_dict and 'category' in product_dict:
                 image_key = f"{product_dict['category']}/{product_dict['image']}"
                 logger.debug(f"Looking for image with key: {image_key}")
-                image_url = get_s3_image_url(image_key)
+                image_url = await get_s3_image_url(image_key)
                 if image_url:
                     product_dict['image_url'] = image_url
                     logger.debug(f"Added image URL to product: {image_url}")
                 else:
                     logger.warning(f"No image URL generated for key: {image_key}")
             
-            return jsonify({
+            _product_cache[key] = product_dict
+            return _json({
                 'status': 'success',
                 'data': product_dict
-            }), 200
+            }, 200)
         else:
             logger.warning(f"Product not found: {product_id}")
-            return jsonify({
+            return _json({
                 'status': 'error',
                 'message': 'Product not found'
-            }), 404
+            }, 404)
             
     except Exception as e:
         logger.error(f"Error retrieving product: {str(e)}")
-        return jsonify({
+        return _json({
             'status': 'error',
             'message': f'Error retrieving product: {str(e)}'
-        }), 500
+        }, 500)
+
+@app.route('/api/products', methods=['GET'])
+async def get_products():
+    """
+    REST API endpoint to get several products by ID in one call
+    Query Parameter: ids (comma-separated product IDs, at most BATCH_GET_SIZE)
+    Returns: Details and image URL for each product found, the IDs that do
+    not exist, and the IDs DynamoDB could not process (e.g. throttling)
+    """
+    try:
+        ids = list(dict.fromkeys(i for i in request.args.get('ids', '').split(',') if i))
+        if not ids:
+            return _json({
+                'status': 'error',
+                'message': 'Missing required query parameter: ids'
+            }, 400)
+        if len(ids) > BATCH_GET_SIZE:
+            return _json({
+                'status': 'error',
+                'message': f'Too many ids: at most {BATCH_GET_SIZE} per request'
+            }, 400)
+        
+        table_name = TABLE_NAME
+        logger.debug(f"Getting {len(ids)} products from table {table_name}")
+        
+        # Get products from DynamoDB
+        products, unprocessed = await get_db().batch_get_items_async(table_name, ids, PRODUCT_ATTRIBUTES)
+        
+        # Convert DynamoDB format to regular dictionaries
+        product_dicts = [
+            Dbase.from_dynamodb_format(products[product_id])
+            for product_id in ids if product_id in products
+        ]
+        
+        # Get image URLs from S3 concurrently
+        with_images = [p for p in product_dicts if 'image' in p and 'category' in p]
+        image_urls = await asyncio.gather(*(
+            get_s3_image_url(f"{p['category']}/{p['image']}") for p in with_images
+        ))
+        for product_dict, image_url in zip(with_images, image_urls):
+            if image_url:
+                product_dict['image_url'] = image_url
+        
+        return _json({
+            'status': 'success',
+            'data': product_dicts,
+            'not_found': [i for i in ids if i not in products and i not in unprocessed],
+            'unprocessed': unprocessed
+        }, 200)
+            
+    except Exception as e:
+        logger.error(f"Error retrieving products: {str(e)}")
+        return _json({
+            'status': 'error',
+            'message': f'Error retrieving products: {str(e)}'
+        }, 500)
 
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return _json({
         'status': 'healthy',
         'message': 'Service is running',
         'config': {
-            'table_name': os.getenv('DYNAMODB_TABLE_NAME', DEFAULT_TABLE_NAME),
-            's3_bucket': os.getenv('S3_BUCKET', DEFAULT_S3_BUCKET)
+            'table_name': TABLE_NAME,
+            's3_bucket': S3_BUCKET
+        },
+        'product_cache': {
+            'size': _product_cache.currsize,
+            'maxsize': _product_cache.maxsize,
+            'ttl': _product_cache.ttl,
+            **_product_cache_stats
         }
-    }), 200
+    }, 200)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
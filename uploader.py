@@ -1,14 +1,29 @@
+import itertools
 import yaml
-from dbase import Dbase
+from dbase import Dbase, BATCH_WRITE_SIZE
+from aws_auth import get_boto_config
 import argparse
+import mimetypes
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
 from debug import debug
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import S3Transfer, TransferConfig
 from botocore.exceptions import ClientError
 
+# Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Number of concurrent S3 image uploads
+S3_UPLOAD_WORKERS = 32
+
 class DataUploader:
     def __init__(self, profile_name=None, region_name='us-east-1'):
         """
@@ -23,7 +38,17 @@ class DataUploader:
         self.config = self._load_config()
         # Initialize S3 client
         session = boto3.Session(profile_name=profile_name, region_name=region_name)
-        self.s3_client = session.client('s3')
+        s3_config = get_boto_config()
+        self.s3_client = session.client('s3', config=s3_config)
+        # One transfer manager, and so one thread pool, shared by every upload.
+        # Its concurrency bounds the S3 requests in flight across all upload
+        # workers, so keep it within the client's connection pool.
+        self._tcfg = TransferConfig(
+            max_concurrency=min(S3_UPLOAD_WORKERS, s3_config.max_pool_connections),
+            use_threads=True,
+            multipart_chunksize=8 * 1024 * 1024
+        )
+        self._transfer = S3Transfer(self.s3_client, self._tcfg)
 
     @debug
     def _load_config(self):
@@ -79,18 +104,18 @@ class DataUploader:
             
             # Upload file to S3
             try:
-                self.s3_client.upload_file(
+                self._transfer.upload_file(
                     image_path,
                     bucket_name,
                     s3_key,
-                    ExtraArgs={
-                        'ContentType': 'image/jpeg'  # Adjust based on image type
+                    extra_args={
+                        'ContentType': mimetypes.guess_type(image_path)[0] or 'image/jpeg'
                     }
                 )
                 print(f"Successfully uploaded image to S3: {s3_key}")
                 return True
                 
-            except ClientError as e:
+            except (ClientError, S3UploadFailedError) as e:
                 print(f"Error uploading to S3: {e}")
                 return False
             
@@ -120,6 +145,24 @@ class DataUploader:
             
         return image_file_path, False
 
+    @staticmethod
+    def _iter_products(file):
+        """
+        Yield products from a YAML stream
+        
+        Accepts either a single document holding a list of products, or a
+        stream of '---'-separated documents with one product (or list of
+        products) each, which is parsed one document at a time.
+        
+        :param file: Open YAML file
+        :return: Iterator over product dictionaries
+        """
+        for document in yaml.load_all(file, Loader=SafeLoader):
+            if isinstance(document, list):
+                yield from document
+            elif document:
+                yield document
+
     @debug
     def bulk_upload_products(self, yaml_file, table_name, start_index=0, count=None):
         """
@@ -134,52 +177,59 @@ class DataUploader:
             # Construct full path to YAML file
             yaml_path = os.path.join(self.config['data_path'], yaml_file)
             
-            # Read YAML file
+            # Read the requested page of products from the YAML file
+            end_index = start_index + count if count is not None else None
             with open(yaml_path, 'r') as file:
-                products = yaml.safe_load(file)
+                products_subset = list(itertools.islice(self._iter_products(file), start_index, end_index))
             
-            if not products:
+            if not products_subset:
                 print("No products found in YAML file")
                 return
             
-            # Calculate end index
-            end_index = start_index + count if count is not None else len(products)
-            end_index = min(end_index, len(products))
-            
-            # Get subset of products based on pagination
-            products_subset = products[start_index:end_index]
-            
-            print(f"\nProcessing products {start_index + 1} to {end_index} of {len(products)}")
+            print(f"\nProcessing products {start_index + 1} to {start_index + len(products_subset)}")
             
             # Initialize counters
-            db_success = 0
-            db_failure = 0
             image_success = 0
             image_failure = 0
             default_image_count = 0
             
-            # Process each product
+            # Add timestamp for tracking
             for product in products_subset:
-                # Add timestamp for tracking
                 product['created_at'] = datetime.utcnow().isoformat()
-                
-                # Upload to database
-                if self.db.add_item(table_name, product):
-                    db_success += 1
-                    
-                    # Get image path and upload image
-                    image_file_path, is_default = self.get_image_path(product, self.config['image_path'])
-                    if is_default:
-                        default_image_count += 1
-                        # Update product with default image name
-                        product['image'] = 'product_image_coming_soon.png'
+            
+            # Write each batch to the database, then hand its images to the pool
+            # so S3 uploads overlap with the next batch write
+            db_success = 0
+            db_failure = 0
+            with ThreadPoolExecutor(max_workers=S3_UPLOAD_WORKERS) as executor:
+                futures = []
+                for i in range(0, len(products_subset), BATCH_WRITE_SIZE):
+                    batch = products_subset[i:i + BATCH_WRITE_SIZE]
+                    failed = self.db.batch_add_items(table_name, batch)
+                    failed_ids = {id(product) for product in failed}
+                    db_failure += len(failed)
+                    db_success += len(batch) - len(failed)
                     
-                    if self.upload_image_to_s3(image_file_path, product, self.config['s3_bucket']):
+                    for product in batch:
+                        if id(product) in failed_ids:
+                            continue
+                        
+                        # Get image path and upload image
+                        image_file_path, is_default = self.get_image_path(product, self.config['image_path'])
+                        if is_default:
+                            default_image_count += 1
+                            # Update product with default image name
+                            product['image'] = 'product_image_coming_soon.png'
+                        
+                        futures.append(executor.submit(
+                            self.upload_image_to_s3, image_file_path, product, self.config['s3_bucket']
+                        ))
+                
+                for future in as_completed(futures):
+                    if future.result():
                         image_success += 1
                     else:
                         image_failure += 1
-                else:
-                    db_failure += 1
             
             # Print summary
             print(f"\nUpload Summary:")